@@ -1,6 +1,7 @@
-from typing import Any, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar, Union
+from collections import defaultdict
+from typing import Any, Callable, DefaultDict, Dict, Generic, List, Optional, Set, Tuple, TypeVar, Union
 
-from .streams import Collector, Stream
+from .streams import Collector, _collect
 
 __all__ = [
     'collecting_and_then',
@@ -37,6 +38,8 @@ def _identity(x: _T) -> _T:
 
 
 class _Wrapper(Generic[_T]):
+    __slots__ = ('value',)
+
     value: _T
 
     def __init__(self, value: _T) -> None:
@@ -70,21 +73,20 @@ class collecting_and_then(Collector[_T, _A, _RR], Generic[_T, _A, _R, _RR]):
         return f'collectors.collecting_and_then({self.downstream!r}, {self.new_finisher!r})'
 
 
-class grouping_by(Collector[_T, Dict[_K, List[_T]], Dict[_K, List[_T]]], Generic[_T, _K]):
+class grouping_by(Collector[_T, DefaultDict[_K, List[_T]], Dict[_K, List[_T]]], Generic[_T, _K]):
     classifier: Callable[[_T], _K]
 
     def __init__(self, classifier: Callable[[_T], _K]) -> None:
         self.classifier = classifier
 
-    def supplier(self) -> Dict[_K, List[_T]]:
-        return {}
+    def supplier(self) -> DefaultDict[_K, List[_T]]:
+        return defaultdict(list)
 
-    def accumulator(self, result: Dict[_K, List[_T]], value: _T) -> None:
-        group = self.classifier(value)
-        result.setdefault(group, []).append(value)
+    def accumulator(self, result: DefaultDict[_K, List[_T]], value: _T) -> None:
+        result[self.classifier(value)].append(value)
 
-    def finisher(self, result: Dict[_K, List[_T]]) -> Dict[_K, List[_T]]:
-        return result
+    def finisher(self, result: DefaultDict[_K, List[_T]]) -> Dict[_K, List[_T]]:
+        return dict(result)
 
     def __repr__(self) -> str:
         return f'collectors.grouping_by({self.classifier!r})'
@@ -116,16 +118,18 @@ class joining(Collector[str, List[str], str]):
 class mapping(Collector[_T, _A, _R], Generic[_T, _U, _A, _R]):
     mapper: Callable[[_T], _U]
     downstream: Collector[_U, _A, _R]
+    _downstream_accumulator: Callable[[_A, _U], Any]
 
     def __init__(self, mapper: Callable[[_T], _U], downstream: Collector[_U, _A, _R]) -> None:
         self.mapper = mapper
         self.downstream = downstream
+        self._downstream_accumulator = downstream.accumulator
 
     def supplier(self) -> _A:
         return self.downstream.supplier()
 
     def accumulator(self, result: _A, value: _T) -> Any:
-        return self.downstream.accumulator(result, self.mapper(value))
+        return self._downstream_accumulator(result, self.mapper(value))
 
     def finisher(self, result: _A) -> _R:
         return self.downstream.finisher(result)
@@ -171,8 +175,8 @@ class partition_downstream(Collector[_T, Tuple[List[_T], List[_T]], Tuple[_D, _D
 
     def finisher(self, result: Tuple[List[_T], List[_T]]) -> Tuple[_D, _D]:
         return (
-            Stream(result[0]).collect(self.downstream),
-            Stream(result[1]).collect(self.downstream)
+            _collect(result[0], self.downstream),
+            _collect(result[1], self.downstream)
         )
 
     def __repr__(self) -> str:
@@ -188,11 +192,14 @@ class reducing(Collector[_T, _Wrapper[Union[_T, _NOTHING_CLASS]], Optional[_T]],
     def supplier(self) -> _Wrapper[_NOTHING_CLASS]:
         return _Wrapper(_NOTHING)
 
-    def accumulator(self, result: _Wrapper[Union[_T, _NOTHING_CLASS]], value: _T) -> None:
-        if result.value is _NOTHING:
+    def accumulator(self, result: _Wrapper[Union[_T, _NOTHING_CLASS]], value: _T,
+                    _NOTHING: _NOTHING_CLASS = _NOTHING) -> None:
+        # _NOTHING is bound as a default so the per-element check is a local lookup
+        current = result.value
+        if current is _NOTHING:
             result.value = value
         else:
-            result.value = self.op(result.value, value)
+            result.value = self.op(current, value)
 
     def finisher(self, result: _Wrapper[Union[_T, _NOTHING_CLASS]]) -> Optional[_T]:
         if result.value is _NOTHING:
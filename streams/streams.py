@@ -2,9 +2,14 @@
 
 
 import abc
+import builtins
 import operator
+import sys
+from collections import OrderedDict, deque
+from functools import reduce as _reduce
+from itertools import chain, groupby, islice
 from typing import (TYPE_CHECKING, Any, Callable, Generic, Iterable, Iterator,
-                    Optional, TypeVar, Union, cast, final, overload)
+                    List, Optional, Tuple, TypeVar, Union, cast, final, overload)
 
 if TYPE_CHECKING:
     from _typeshed import SupportsLessThan
@@ -19,6 +24,60 @@ if TYPE_CHECKING:
 
 __all__ = ['Collector', 'Stream']
 
+_Op = Tuple[str, Callable[[Any], Any]]
+
+_NOTHING: Any = object()
+
+_FUSED_STEPS = {
+    'map': 'x = {f}(x)',
+    'filter': 'if not {f}(x): continue',
+    'peek': '{f}(x)',
+}
+
+# Iterator types whose length hint is exact and which __setstate__ can move to the
+# end, so count() need not drain them
+_SIZED_ITERATORS = frozenset((
+    type(iter(())), type(iter([])), type(iter(range(0))),
+    type(iter('')), type(iter(b'')), type(iter(bytearray())),
+))
+
+# Sources kept as-is until iterated, for the len()/slicing fast paths
+_SEQUENCES = frozenset((range, list, tuple))
+
+# reduce_jit kernels by _jit_key(), least recently used first. None under a key marks
+# an accumulator numba cannot compile, and None under (key, identity type) one that
+# failed to type for that identity. Bounded, as callers usually pass fresh lambdas.
+_JIT_CACHE_SIZE = 64
+_JIT_KERNELS: 'OrderedDict[Any, Optional[Callable[..., Any]]]' = OrderedDict()
+
+# Largest magnitude below which a float64 holds every integer exactly
+_FLOAT_EXACT = float(2 ** 53)
+_INT64 = range(-2 ** 63, 2 ** 63)
+
+_FUSED_CACHE: dict[Tuple[Tuple[str, ...], bool], Callable[..., Any]] = {}
+
+
+def _fused(kinds: Tuple[str, ...], push: bool = False) -> Callable[..., Any]:
+    """Compile (once per shape) a loop running all staged ops
+
+    By default this is a generator over the results. With push, it is a plain
+    function that passes each result to a sink instead, so terminal ops can
+    drain the pipeline without resuming a generator per element.
+    """
+    key = (kinds, push)
+    try:
+        return _FUSED_CACHE[key]
+    except KeyError:
+        pass
+    params = ''.join(f', f{i}' for i in range(len(kinds)))
+    lines = [f'def fused(it{", sink" if push else ""}{params}):', '    for x in it:']
+    lines.extend('        ' + _FUSED_STEPS[kind].format(f=f'f{i}') for (i, kind) in enumerate(kinds))
+    lines.append('        sink(x)' if push else '        yield x')
+    namespace: dict[str, Any] = {}
+    exec('\n'.join(lines), namespace)
+    fused = _FUSED_CACHE[key] = namespace['fused']
+    return fused
+
 
 class Collector(abc.ABC, Generic[_T, _A, _R]):
     @abc.abstractmethod
@@ -45,65 +104,335 @@ class Collector(abc.ABC, Generic[_T, _A, _R]):
         return WrapperCollector()
 
 
+_JIT_SCALARS = frozenset((bool, int, float, complex, str, bytes, type(None)))
+
+
+def _code_names(code: Any) -> Iterator[str]:
+    yield from code.co_names
+    for const in code.co_consts:
+        if hasattr(const, 'co_names'):
+            yield from _code_names(const)
+
+
+def _jit_key(accumulator: Callable[..., Any], is_jitted: Callable[[Any], bool]) -> Any:
+    """Cache key covering everything numba freezes into a compiled accumulator
+
+    numba compiles the defaults, closure values and referenced globals in as
+    constants, so the key holds their current values as well as the code and
+    where it came from. Returns None if any of them is not a hashable scalar or
+    a jitted function, since a compiled kernel could then go stale.
+    """
+    try:
+        code = accumulator.__code__
+    except AttributeError:
+        return accumulator
+    namespace = accumulator.__globals__
+    captured = list(accumulator.__defaults__ or ())
+    try:
+        captured.extend(cell.cell_contents for cell in accumulator.__closure__ or ())
+    except ValueError:  # an unassigned closure cell
+        return None
+    captured.extend(namespace[name] for name in sorted(set(_code_names(code))) if name in namespace)
+    for v in captured:
+        if type(v) not in _JIT_SCALARS and not is_jitted(v):
+            return None
+    # Types are part of the key: numba compiles 1 and 1.0 as different constants
+    key = (code, code.co_filename, id(namespace), tuple((type(v), v) for v in captured))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _jit_remember(key: Any, kernel: Optional[Callable[..., Any]]) -> None:
+    _JIT_KERNELS[key] = kernel
+    _JIT_KERNELS.move_to_end(key)
+    if len(_JIT_KERNELS) > _JIT_CACHE_SIZE:
+        _JIT_KERNELS.popitem(last=False)
+
+
+def _build_jit_kernel(accumulator: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    import numba
+    from numba.extending import is_jitted
+    # njit raises TypeError for builtins, which then stay on the interpreted path
+    acc = accumulator if is_jitted(accumulator) else numba.njit(accumulator)
+
+    @numba.njit
+    def kernel(start: int, stop: int, step: int, identity: Any) -> Any:
+        # The float64 shadow cannot wrap around, so a result it matches while staying
+        # within exact-integer range is the one Python's unbounded ints would give
+        x = identity
+        y = float(identity)
+        for i in range(start, stop, step):
+            x = acc(x, i)
+            y = acc(y, float(i))
+            if not abs(y) <= _FLOAT_EXACT:
+                return x, False
+        return x, x == y
+    return kernel
+
+
+def _jit_reduce(r: range, identity: Any, accumulator: Callable[[Any, int], Any]) -> Any:
+    """Reduce r with a numba kernel, or return _NOTHING if the result cannot be trusted"""
+    if type(identity) not in (int, float) or (type(identity) is int and identity not in _INT64):
+        return _NOTHING
+    if r.start not in _INT64 or r.stop not in _INT64 or r.step not in _INT64:
+        return _NOTHING
+    try:
+        from numba.extending import is_jitted
+    except ImportError:
+        return _NOTHING
+    key = _jit_key(accumulator, is_jitted)
+    if key is None:
+        return _NOTHING
+    failed = (key, type(identity))
+    if failed in _JIT_KERNELS:
+        _JIT_KERNELS.move_to_end(failed)
+        return _NOTHING
+    kernel = _JIT_KERNELS.get(key, _NOTHING)
+    if kernel is _NOTHING:
+        try:
+            kernel = _build_jit_kernel(accumulator)
+        except (ImportError, TypeError):
+            kernel = None
+        _jit_remember(key, kernel)
+    else:
+        _JIT_KERNELS.move_to_end(key)
+    if kernel is None:
+        return _NOTHING
+    from numba.core.errors import NumbaError
+    try:
+        result, exact = kernel(r.start, r.stop, r.step, identity)
+    except NumbaError:
+        _jit_remember(failed, None)
+        return _NOTHING
+    return result if exact else _NOTHING
+
+
+def _join(it: Iterable[str], delimiter: str, prefix: str, suffix: str) -> str:
+    return prefix + delimiter.join(it) + suffix
+
+
+def _collect(it: Iterable[_T], collector: Collector[_T, Any, _R]) -> _R:
+    """Stream.collect over any iterable, without wrapping it in a Stream"""
+    from . import collectors
+    # The builtin-container collectors can mostly be filled by their constructors in C
+    kind = type(collector)
+    if kind is collectors.to_list:
+        return cast(_R, list(it))
+    if kind is collectors.to_set:
+        return cast(_R, set(it))
+    if kind is collectors.to_dict:
+        # Inlined accumulator: still raises at the first duplicate, before mapping its value
+        assert isinstance(collector, collectors.to_dict)
+        key_mapper = collector.key_mapper
+        value_mapper = collector.value_mapper
+        mapping: dict[Any, Any] = {}
+        for value in it:
+            key = key_mapper(value)
+            if key in mapping:
+                raise ValueError('duplicate key')
+            mapping[key] = value_mapper(value)
+        return cast(_R, mapping)
+    if kind is collectors.collecting_and_then:
+        # Collect straight into the downstream, keeping its own fast path
+        assert isinstance(collector, collectors.collecting_and_then)
+        return collector.new_finisher(_collect(it, collector.downstream))
+    if kind is collectors.joining:
+        assert isinstance(collector, collectors.joining)
+        return cast(_R, _join(cast(Iterable[str], it), collector.delimiter, collector.prefix, collector.suffix))
+    accumulator = collector.accumulator
+    result = collector.supplier()
+    for value in it:
+        accumulator(result, value)
+    return collector.finisher(result)
+
+
+class _Applier:
+    """Picklable run of map/filter ops for a worker: (result,), or () if filtered out"""
+    __slots__ = ('ops',)
+
+    ops: Tuple[_Op, ...]
+
+    def __init__(self, ops: Tuple[_Op, ...]) -> None:
+        self.ops = ops
+
+    def __call__(self, x: Any) -> Tuple[Any, ...]:
+        for (kind, fn) in self.ops:
+            if kind == 'map':
+                x = fn(x)
+            elif not fn(x):
+                return ()
+        return (x,)
+
+
+def _parallel_ops(it: Iterable[Any], ops: Tuple[_Op, ...],
+                  workers: Optional[int], chunksize: int) -> Iterator[Any]:
+    items = list(it)
+    if len(items) < 2 * chunksize:
+        yield from _fused(tuple(kind for (kind, _) in ops))(items, *(fn for (_, fn) in ops))
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    results = items
+    # Every pass is collected before the with block ends, so the workers are shut
+    # down before anything is yielded rather than whenever this generator is freed
+    with ProcessPoolExecutor(workers) as pool:
+        # Each run of map/filter ops is one pass through the pool; peek actions
+        # have to run in this process, so they go between passes
+        for (is_peek, group) in groupby(ops, key=lambda op: op[0] == 'peek'):
+            run = tuple(group)
+            if is_peek:
+                results = list(_fused(tuple(kind for (kind, _) in run))(results, *(fn for (_, fn) in run)))
+            else:
+                results = list(chain.from_iterable(pool.map(_Applier(run), results, chunksize=chunksize)))
+    yield from results
+
+
 @final
 class Stream(Generic[_T]):
-    it: Iterator[_T]
+    # What is left of the source, shared with the streams staged from this one, so
+    # consuming any of them is seen by all, whether or not the source is an iterator
+    _cell: List[Any]
+    _ops: Tuple[_Op, ...]
+    _it: Optional[Iterator[_T]]
+    _parallel: Optional[Tuple[Optional[int], int]]
 
     def __init__(self, it: Union[Iterable[_T], Iterator[_T]]) -> None:
-        if hasattr(it, '__iter__'):
-            it = iter(it)
-        self.it = cast(Iterator[_T], it)
+        self._it = None
+        if isinstance(it, Stream):
+            # Streams are iterators too; take over the pending state instead of nesting
+            if it._it is None:
+                self._cell = it._cell
+                self._ops = it._ops
+            else:
+                self._cell = [it._it]
+                self._ops = ()
+            self._parallel = it._parallel
+            return
+        self._cell = [it]
+        self._ops = ()
+        self._parallel = None
+
+    @property
+    def it(self) -> Iterator[_T]:
+        it = self._it
+        if it is None:
+            it = self._it = self._materialize()
+        return it
+
+    def _source(self) -> Iterator[Any]:
+        cell = self._cell
+        source = cell[0]
+        if not hasattr(source, '__next__'):
+            source = cell[0] = iter(source)
+        return source
+
+    def _materialize(self) -> Iterator[_T]:
+        it = self._source()
+        ops = self._ops
+        if ops:
+            if self._parallel is not None:
+                it = _parallel_ops(it, ops, *self._parallel)
+            elif len(ops) == 1 and ops[0][0] == 'map':
+                it = map(ops[0][1], it)
+            elif len(ops) == 1 and ops[0][0] == 'filter':
+                it = filter(ops[0][1], it)
+            else:
+                kinds = tuple(kind for (kind, _) in ops)
+                it = _fused(kinds)(it, *(fn for (_, fn) in ops))
+            self._ops = ()
+        return it
+
+    def _push(self, sink: Callable[[_T], Any]) -> None:
+        ops = self._ops
+        if self._it is not None or not ops or self._parallel is not None:
+            for v in self.it:
+                sink(v)
+            return
+        # Ops stay staged until the loop finishes, so a raising sink leaves the rest
+        # of the stream still mapped and filtered
+        _fused(tuple(kind for (kind, _) in ops), push=True)(self._source(), sink, *(fn for (_, fn) in ops))
+        self._ops = ()
+
+    def _sequence(self) -> Optional[Union[range, List[_T], Tuple[_T, ...]]]:
+        source = self._cell[0]
+        if self._it is None and not self._ops and type(source) in _SEQUENCES:
+            return cast(Union[range, List[_T], Tuple[_T, ...]], source)
+        return None
+
+    def _drop(self, seq: Union[range, List[_T], Tuple[_T, ...]]) -> None:
+        # A fast path used up the whole sequence, as iterating it would have
+        self._cell[0] = seq[len(seq):]
+
+    def _stage(self, kind: str, fn: Callable[[Any], Any]) -> 'Stream[Any]':
+        stream: Stream[Any] = Stream(self)
+        stream._ops += ((kind, fn),)
+        return stream
+
+    def _derive(self, it: Union[Iterable[Any], Iterator[Any]]) -> 'Stream[Any]':
+        stream: Stream[Any] = Stream(it)
+        stream._parallel = self._parallel
+        return stream
 
     def __iter__(self) -> Iterator[_T]:
         return self.it
 
     def __next__(self) -> _T:
-        return self.it.__next__()
+        it = self._it
+        if it is None:
+            it = self.it
+        return it.__next__()
 
     def all_match(self, predicate: Callable[[_T], bool]) -> bool:
-        return all(predicate(x) for x in self.it)
+        return all(map(predicate, self.it))
 
     def any_match(self, predicate: Callable[[_T], bool]) -> bool:
-        return any(predicate(x) for x in self.it)
+        return any(map(predicate, self.it))
 
     @staticmethod
     def concat(*streams: 'Stream[_T]') -> 'Stream[_T]':
-        def it():
-            for stream in streams:
-                yield from stream.it
-        return Stream(it())
+        return Stream(chain(*[stream.it for stream in streams]))
 
     def count(self) -> int:
-        return sum(1 for _ in self.it)
+        seq = self._sequence()
+        if seq is not None:
+            self._drop(seq)
+            return len(seq)
+        it = self.it
+        if type(it) in _SIZED_ITERATORS:
+            n = operator.length_hint(it)
+            cast(Any, it).__setstate__(sys.maxsize)
+            return n
+        last = deque(enumerate(it, 1), maxlen=1)
+        return last[0][0] if last else 0
 
     def distinct(self) -> 'Stream[_T]':
-        def it():
-            elems = set()
-            for elem in self.it:
-                if elem not in elems:
-                    elems.add(elem)
+        def it(source: Iterator[_T]) -> Iterator[_T]:
+            elems: set[_T] = set()
+            add = elems.add
+            contains = elems.__contains__
+            for elem in source:
+                if not contains(elem):
+                    add(elem)
                     yield elem
-        return Stream(it())
+        return self._derive(it(self.it))
 
     @staticmethod
     def empty() -> 'Stream[Any]':
         return Stream(())
 
     def filter(self, predicate: Callable[[_T], bool]) -> 'Stream[_T]':
-        return Stream(filter(predicate, self.it))
+        return self._stage('filter', predicate)
 
     def get_one(self) -> Optional[_T]:
         return next(self.it, None)
 
     def flat_map(self, mapper: Callable[[_T], Union[Iterable[_R], Iterator[_R]]]) -> 'Stream[_R]':
-        def it():
-            for v in self.it:
-                yield from mapper(v)
-        return Stream(it())
+        return self._derive(chain.from_iterable(map(mapper, self.it)))
 
     def for_each(self, action: Callable[[_T], Any]) -> None:
-        for v in self.it:
-            action(v)
+        self._push(action)
 
     @staticmethod
     def iterate(seed: _T, f: Callable[[_T], _T]) -> 'Stream[_T]':
@@ -115,13 +444,10 @@ class Stream(Generic[_T]):
         return Stream(it())
 
     def limit(self, max_size: int) -> 'Stream[_T]':
-        def it():
-            for _ in range(max_size):
-                yield next(self.it)
-        return Stream(it())
+        return self._derive(islice(self.it, max(max_size, 0)))
 
     def map(self, mapper: Callable[[_T], _R]) -> 'Stream[_R]':
-        return Stream(map(mapper, self.it))
+        return self._stage('map', mapper)
 
     def max(self: 'Stream[_T_SupportsLessThan]') -> '_T_SupportsLessThan':
         return max(self.it)
@@ -129,38 +455,64 @@ class Stream(Generic[_T]):
     def min(self: 'Stream[_T_SupportsLessThan]') -> '_T_SupportsLessThan':
         return min(self.it)
 
-    def none_match(self) -> bool:
-        return not any(self.it)
+    def none_match(self, predicate: Callable[[_T], bool]) -> bool:
+        return not any(map(predicate, self.it))
 
     @staticmethod
     def of(*values: _T) -> 'Stream[_T]':
         return Stream(values)
 
+    def parallel(self, workers: Optional[int] = None, chunksize: int = 64) -> 'Stream[_T]':
+        """Run the following map and filter stages in a process pool
+
+        mapper and predicate must be picklable. Consecutive map/filter stages share
+        one pass through the pool, while peek actions run in this process. The
+        staged input is drained when first iterated, so an infinite stream never
+        yields; inputs shorter than two chunks run serially.
+        """
+        # Stages from before this call stay in this process, so they are applied here
+        stream = Stream(self.it) if self._ops else Stream(self)
+        stream._parallel = (workers, chunksize)
+        return stream
+
     def peek(self, action: Callable[[_T], Any]) -> 'Stream[_T]':
-        def it():
-            for v in self.it:
-                action(v)
-                yield v
-        return Stream(it())
+        return self._stage('peek', action)
 
     def skip(self, n: int) -> 'Stream[_T]':
-        try:
-            for _ in range(n):
-                next(self.it)
-        except StopIteration:
-            pass
-        return Stream(self.it)
+        seq = self._sequence()
+        if isinstance(seq, range):
+            self._cell[0] = seq[max(n, 0):]
+            return Stream(self)
+        it = self.it
+        if n > 0:
+            next(islice(it, n, n), None)
+        return self._derive(it)
 
     def sorted(self: 'Stream[_T_SupportsLessThan]') -> 'Stream[_T_SupportsLessThan]':
-        return Stream(sorted(self.it))
+        seq = self._sequence()
+        if isinstance(seq, range):
+            self._drop(seq)
+            return self._derive(seq if seq.step > 0 else seq[::-1])
+        return self._derive(sorted(self.it))
 
     def to_list(self) -> list[_T]:
-        return list(self.it)
+        if len(self._ops) < 2 or self._parallel is not None:
+            return list(self.it)
+        result: list[_T] = []
+        self._push(result.append)
+        return result
+
+    def join(self: 'Stream[str]', delimiter: str = '', prefix: str = '', suffix: str = '') -> str:
+        return _join(self.it, delimiter, prefix, suffix)
 
     def iterator(self) -> Iterator[_T]:
         return self.it
 
     def average(self):
+        seq = self._sequence()
+        if isinstance(seq, range):
+            self._drop(seq)
+            return (seq[0] + seq[-1]) / 2 if seq else None
         try:
             sum = next(self.it)
         except StopIteration:
@@ -172,7 +524,20 @@ class Stream(Generic[_T]):
         return sum / count
 
     def sum(self):
-        return self.reduce(operator.add)
+        seq = self._sequence()
+        if isinstance(seq, range):
+            self._drop(seq)
+            return (seq[0] + seq[-1]) * len(seq) // 2 if seq else None
+        it = cast(Iterator[Any], self.it)
+        first = next(it, _NOTHING)
+        if first is _NOTHING:
+            return None
+        # builtins.sum rejects str/bytes starts, so join those instead
+        if isinstance(first, str):
+            return first + ''.join(it)
+        if isinstance(first, (bytes, bytearray)):
+            return first + b''.join(it)
+        return builtins.sum(it, first)
 
     @staticmethod
     def range(start: int, stop: Optional[int] = None, step: Optional[int] = None) -> 'Stream[int]':
@@ -185,25 +550,49 @@ class Stream(Generic[_T]):
         return Stream(r)
 
     def reduce_identity(self, identity: _U, accumulator: Callable[[_U, _T], _U]) -> _U:
-        for v in self.it:
-            identity = accumulator(identity, v)
-        return identity
+        return _reduce(accumulator, self.it, identity)
 
     def reduce(self, accumulator: Callable[[_T, _T], _T]) -> Optional[_T]:
-        try:
-            result = next(self.it)
-        except StopIteration:
+        it = self.it
+        first = next(it, _NOTHING)
+        if first is _NOTHING:
             return None
-        return self.reduce_identity(result, accumulator)
+        return _reduce(accumulator, it, first)
+
+    def reduce_jit(self: 'Stream[int]', identity: _U, accumulator: Callable[[_U, int], _U]) -> _U:
+        """reduce_identity, compiled with numba when the stream's source is a range
+
+        Only int and float identities are compiled. numba freezes the globals and
+        closure values the accumulator reads, so it is only compiled when those are
+        scalars or jitted functions, and recompiled when their values change. The
+        compiled result is used only if a float64 run of the same loop agrees with
+        it exactly and stays within 2**53; otherwise, as without numba, this falls
+        back to reduce_identity.
+        """
+        r = self._sequence()
+        if isinstance(r, range):
+            result = _jit_reduce(r, identity, accumulator)
+            if result is not _NOTHING:
+                self._drop(r)
+                return result
+        return self.reduce_identity(identity, accumulator)
 
     def collect_simple(self, supplier: Callable[[], _R], accumulator: Callable[[_R, _T], Any]) -> _R:
-        return self.collect(Collector.of(supplier, accumulator))
+        # Same as collect(Collector.of(supplier, accumulator)), minus the wrapper calls
+        result = supplier()
+        for value in self.it:
+            accumulator(result, value)
+        return result
 
     def collect(self, collector: Collector[_T, Any, _R]) -> _R:
-        result = collector.supplier()
-        for value in self.it:
-            collector.accumulator(result, value)
-        return collector.finisher(result)
+        return _collect(self.it, collector)
 
     def __repr__(self) -> str:
-        return f'Stream({self.it!r})'
+        # Built from the pending state, as reading self.it would materialize the stream
+        if self._it is not None:
+            result = f'Stream({self._it!r})'
+        else:
+            result = f'Stream({self._cell[0]!r})'
+        if self._parallel is not None:
+            result += '.parallel({!r}, {!r})'.format(*self._parallel)
+        return result + ''.join(f'.{kind}({fn!r})' for (kind, fn) in self._ops)